@@ -1,8 +1,8 @@
 from __future__ import annotations
 import argparse
-import json
 from pathlib import Path
-from backend.app.services.detector import detector_service
+import orjson
+from server.app.services.detector import get_detector_service
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run YOLO object detection on a video.")
@@ -30,23 +30,35 @@ def parse_args() -> argparse.Namespace:
         default=0.3,
         help="Minimum confidence threshold for detections.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Number of sampled frames per YOLO forward pass (defaults to BATCH_SIZE).",
+    )
     parser.add_argument(
         "--output",
         type=Path,
         default=None,
         help="Optional path to write the detections JSON output.",
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent the JSON output for human inspection.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
 
-    result = detector_service.process_video(
+    result = get_detector_service().process_video(
         video_path=args.video,
         frame_interval_seconds=args.frame_interval,
         min_confidence=args.min_confidence,
         target_object=args.target,
+        batch_size=args.batch_size,
     )
 
     summary = result["summary"]
@@ -58,12 +70,14 @@ def main() -> None:
         f"{summary['target_hits']} target hits"
     )
 
+    payload = orjson.dumps(result, option=orjson.OPT_INDENT_2 if args.pretty else 0)
+
     if args.output:
         args.output.parent.mkdir(parents=True, exist_ok=True)
-        args.output.write_text(json.dumps(result, indent=2))
+        args.output.write_bytes(payload)
         print(f"Detection results written to {args.output}")
     else:
-        print(json.dumps(result, indent=2))
+        print(payload.decode())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,168 @@
+"""
+Build an INT8 TensorRT engine for the detector using frames from a video.
+
+Frames are sampled evenly across the video, written to a calibration folder
+and handed to Ultralytics, which drives TensorRT's entropy calibrator over
+them while building the engine. Run from the repository root:
+
+    python -m scripts.quantize --video footage.mp4
+
+Then start the server with ``YOLO_USE_INT8=1`` to load the resulting engine.
+"""
+
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import cv2
+import numpy as np
+import yaml
+import ultralytics
+from ultralytics import YOLO
+from ultralytics.utils.checks import check_version
+from server.app.config import get_settings
+
+# First release whose TensorRT exporter honours ``int8=True``/``data=``; older
+# ones silently build an FP32 engine instead.
+MIN_ULTRALYTICS_VERSION = "8.2.30"
+
+
+def parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Export the YOLO model to an INT8 TensorRT engine."
+    )
+    parser.add_argument(
+        "--video",
+        type=Path,
+        required=True,
+        help="Video whose frames are used as the calibration set.",
+    )
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=Path(settings.model_path),
+        help="Path to the YOLO PyTorch weights to quantize.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(settings.int8_engine_path),
+        help="Where to write the INT8 engine.",
+    )
+    parser.add_argument(
+        "--calib-dir",
+        type=Path,
+        default=Path("calib"),
+        help="Folder that receives the sampled calibration frames.",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=500,
+        help="Number of frames to sample for calibration.",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=max(settings.batch_size, 16),
+        help="Maximum batch size the engine is built for.",
+    )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=settings.image_size,
+        help="Inference image size the engine is specialised for.",
+    )
+    return parser.parse_args()
+
+
+def sample_frames(video_path: Path, image_dir: Path, count: int) -> int:
+    """Write ``count`` evenly spaced frames from the video to ``image_dir``."""
+    capture = cv2.VideoCapture(str(video_path))
+    if not capture.isOpened():
+        raise RuntimeError(f"Unable to open video file: {video_path}")
+
+    image_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    try:
+        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+        if total_frames <= 0:
+            raise RuntimeError(f"Unable to determine frame count of {video_path}")
+
+        indices = np.unique(
+            np.linspace(0, total_frames - 1, num=min(count, total_frames)).astype(int)
+        )
+        for frame_index in indices:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(frame_index))
+            ret, frame = capture.read()
+            if not ret:
+                continue
+            cv2.imwrite(str(image_dir / f"frame_{frame_index:07d}.jpg"), frame)
+            written += 1
+    finally:
+        capture.release()
+
+    return written
+
+
+def ensure_int8_support() -> None:
+    """Exit unless this machine can actually build an INT8 TensorRT engine."""
+    if not check_version(ultralytics.__version__, f">={MIN_ULTRALYTICS_VERSION}"):
+        raise SystemExit(
+            f"INT8 TensorRT export needs ultralytics>={MIN_ULTRALYTICS_VERSION}, "
+            f"found {ultralytics.__version__}"
+        )
+
+    try:
+        import tensorrt as trt
+    except ImportError as exc:
+        raise SystemExit("INT8 export needs TensorRT ('pip install tensorrt')") from exc
+
+    # Ultralytics falls back to FP16/FP32 without an error when the GPU lacks
+    # fast INT8 kernels, so check the same condition up front.
+    if not trt.Builder(trt.Logger(trt.Logger.WARNING)).platform_has_fast_int8:
+        raise SystemExit("This GPU has no fast INT8 support; TensorRT would build a non-INT8 engine")
+
+
+def main() -> None:
+    args = parse_args()
+    ensure_int8_support()
+
+    image_dir = args.calib_dir / "images"
+    written = sample_frames(args.video, image_dir, args.frames)
+    if not written:
+        raise SystemExit(f"No frames could be read from '{args.video}'")
+    print(f"Wrote {written} calibration frames to {image_dir}")
+
+    model = YOLO(str(args.model))
+    data_yaml = args.calib_dir / "calib.yaml"
+    data_yaml.write_text(
+        yaml.safe_dump(
+            {
+                "path": str(args.calib_dir.resolve()),
+                "train": "images",
+                "val": "images",
+                "names": model.names,
+            },
+            sort_keys=False,
+        )
+    )
+
+    exported = Path(
+        model.export(
+            format="engine",
+            int8=True,
+            data=str(data_yaml),
+            dynamic=True,
+            batch=args.batch,
+            imgsz=args.imgsz,
+        )
+    )
+    if exported.resolve() != args.output.resolve():
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        exported.replace(args.output)
+    print(f"INT8 TensorRT engine written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,71 @@
 from __future__ import annotations
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import List
+from typing import List, Tuple
 
-@dataclass(frozen=True)
-class Settings:
-    """Runtime configuration loaded from environment variables."""
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_size(name: str, default: str) -> Tuple[int, int]:
+    """Parse a ``WIDTHxHEIGHT`` environment variable such as ``1280x720``."""
+    width, height = os.getenv(name, default).lower().split("x")
+    return int(width), int(height)
 
-    model_path: str = os.getenv("YOLO_MODEL_PATH", "model.pt")
-    frame_interval_seconds: float = float(os.getenv("FRAME_INTERVAL_SECONDS", "1.0"))
-    min_confidence: float = float(os.getenv("MIN_CONFIDENCE", "0.6"))
-    gemini_api_key: str | None = os.getenv("GEMINI_API_KEY")
-    cors_origins: List[str] = None  # type: ignore[assignment]
 
-    def __post_init__(self) -> None:
-        cors_raw = os.getenv("CORS_ORIGINS", "")
-        object.__setattr__(
-            self,
-            "cors_origins",
-            [origin.strip() for origin in cors_raw.split(",") if origin.strip()]
-            or ["*"],
-        )
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Runtime configuration; see ``get_settings`` for the environment variables."""
+
+    model_path: str = "model.pt"
+    engine_path: str = "model.engine"
+    use_tensorrt: bool = False
+    int8_engine_path: str = "model.int8.engine"
+    use_int8: bool = False
+    image_size: int = 640
+    half: bool = False
+    use_nvdec: bool = False
+    use_pyav: bool = False
+    pyav_hwaccel: str | None = "cuda"
+    frame_interval_seconds: float = 1.0
+    min_confidence: float = 0.6
+    batch_size: int = 8
+    prefetch_frames: int | None = None
+    warmup: bool = True
+    warmup_size: Tuple[int, int] = (1280, 720)
+    gemini_api_key: str | None = None
+    cors_origins: List[str] = field(default_factory=lambda: ["*"])
 
 
 @lru_cache
 def get_settings() -> Settings:
-    """Return a cached Settings instance."""
-    return Settings()
+    """
+    Return the Settings built from environment variables.
 
-settings = get_settings()
+    The environment is read on the first call rather than at import time, so
+    variables set after ``server.app.config`` is imported still take effect.
+    """
+    cors_raw = os.getenv("CORS_ORIGINS", "")
+    prefetch_raw = os.getenv("PREFETCH_FRAMES", "").strip()
+    return Settings(
+        model_path=os.getenv("YOLO_MODEL_PATH", "model.pt"),
+        engine_path=os.getenv("YOLO_ENGINE_PATH", "model.engine"),
+        use_tensorrt=_env_flag("YOLO_USE_TENSORRT"),
+        int8_engine_path=os.getenv("YOLO_INT8_ENGINE_PATH", "model.int8.engine"),
+        use_int8=_env_flag("YOLO_USE_INT8"),
+        image_size=int(os.getenv("YOLO_IMAGE_SIZE", "640")),
+        half=_env_flag("YOLO_HALF"),
+        use_nvdec=_env_flag("USE_NVDEC"),
+        use_pyav=_env_flag("USE_PYAV"),
+        pyav_hwaccel=os.getenv("PYAV_HWACCEL", "cuda") or None,
+        frame_interval_seconds=float(os.getenv("FRAME_INTERVAL_SECONDS", "1.0")),
+        min_confidence=float(os.getenv("MIN_CONFIDENCE", "0.6")),
+        batch_size=int(os.getenv("BATCH_SIZE", "8")),
+        prefetch_frames=int(prefetch_raw) if prefetch_raw else None,
+        warmup=_env_flag("YOLO_WARMUP", "1"),
+        warmup_size=_env_size("YOLO_WARMUP_SIZE", "1280x720"),
+        gemini_api_key=os.getenv("GEMINI_API_KEY"),
+        cors_origins=[origin.strip() for origin in cors_raw.split(",") if origin.strip()]
+        or ["*"],
+    )
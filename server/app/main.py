@@ -1,20 +1,23 @@
 from __future__ import annotations
-import json
 import logging
 import os
 import re
-import shutil
+import sys
 import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
+import aiofiles
 import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import FastAPI, File, Form, HTTPException, UploadFile
 from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from .config import settings
-from .services.detector import detector_service
+from .config import get_settings
+from .services.detector import get_detector_service
 
 logging.basicConfig(
     level=os.getenv("LOG_LEVEL", "INFO"),
@@ -26,17 +29,57 @@ app = FastAPI(
     title="Sherlocked Object Detection API",
     description="Upload video footage and detect objects using YOLO.",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    allow_origins=get_settings().cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 
+GEMINI_URL = (
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
+)
+
+# Shared across intent requests so the TLS connection to Gemini is reused.
+_gemini_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_gemini_client() -> httpx.AsyncClient:
+    global _gemini_client
+    if _gemini_client is None or _gemini_client.is_closed:
+        _gemini_client = httpx.AsyncClient(
+            timeout=10,
+            http2=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+    return _gemini_client
+
+
+@app.on_event("startup")
+async def load_detector() -> None:
+    # Build (and warm up) the model before serving instead of on the first upload.
+    await run_in_threadpool(get_detector_service)
+
+
+@app.on_event("startup")
+async def open_gemini_client() -> None:
+    if get_settings().gemini_api_key:
+        _get_gemini_client()
+
+
+@app.on_event("shutdown")
+async def close_gemini_client() -> None:
+    global _gemini_client
+    if _gemini_client is not None:
+        await _gemini_client.aclose()
+        _gemini_client = None
+
+
 @app.get("/api/health")
 async def health_check() -> dict[str, str]:
     """Simple health endpoint for monitoring."""
@@ -47,9 +90,9 @@ async def health_check() -> dict[str, str]:
 async def process_video(
     file: UploadFile = File(...),
     target_object: Optional[str] = Form(default=None),
-    frame_interval_seconds: float = Form(default=settings.frame_interval_seconds),
-    min_confidence: float = Form(default=settings.min_confidence),
-) -> JSONResponse:
+    frame_interval_seconds: float = Form(default=get_settings().frame_interval_seconds),
+    min_confidence: float = Form(default=get_settings().min_confidence),
+) -> ORJSONResponse:
     """
     Receive an uploaded video, run YOLO inference, and return detection results.
     """
@@ -77,14 +120,17 @@ async def process_video(
             )
 
             detection_result = await run_in_threadpool(
-                detector_service.process_video,
+                get_detector_service().process_video,
                 tmp_file.name,
                 frame_interval_seconds,
                 min_confidence,
                 target_object,
+                batch_size=get_settings().batch_size,
             )
 
-            return JSONResponse(
+            # Returned directly so the (potentially large) payload skips
+            # jsonable_encoder and is serialised by orjson in one pass.
+            return ORJSONResponse(
                 {
                     "success": True,
                     **detection_result,
@@ -111,15 +157,38 @@ async def process_video(
                 logger.warning("Failed to remove temp file '%s'", tmp_file.name)
 
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Only Linux's sendfile(2) accepts a regular file as the destination.
+_SENDFILE_TO_FILES = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+
 async def _copy_upload_to_disk(upload: UploadFile, destination: str) -> None:
     """Persist the uploaded file to disk without blocking the event loop."""
+    # Large uploads are spooled to a real temp file by Starlette; on Linux copy
+    # those in-kernel. ``_rolled`` is a private SpooledTemporaryFile attribute
+    # (there is no public way to ask), so a missing one just means streaming.
+    if _SENDFILE_TO_FILES and getattr(upload.file, "_rolled", False):
+        try:
+            await run_in_threadpool(_sendfile_to_disk, upload.file.fileno(), destination)
+            return
+        except OSError as exc:
+            logger.warning("sendfile copy failed (%s); streaming the upload instead", exc)
+            await upload.seek(0)
 
-    def _copy() -> None:
-        upload.file.seek(0)
-        with open(destination, "wb") as target:
-            shutil.copyfileobj(upload.file, target)
+    async with aiofiles.open(destination, "wb") as target:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            await target.write(chunk)
 
-    await run_in_threadpool(_copy)
+
+def _sendfile_to_disk(source_fd: int, destination: str) -> None:
+    size = os.fstat(source_fd).st_size
+    with open(destination, "wb") as target:
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(target.fileno(), source_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
 
 
 class IntentRequest(BaseModel):
@@ -132,7 +201,7 @@ class IntentResponse(BaseModel):
     pairs: List[dict] = []  # List of {"object": str, "color": str} pairs
 
 
-STOPWORDS = {
+STOPWORDS = frozenset({
     "find",
     "show",
     "frame",
@@ -161,7 +230,24 @@ STOPWORDS = {
     "footage",
     "objects",
     "and",
-}
+})
+
+# Common color names recognised by the fallback intent parser.
+COLOR_KEYWORDS = frozenset({
+    "red", "blue", "green", "yellow", "orange", "purple", "pink",
+    "black", "white", "gray", "grey", "brown", "cyan", "navy",
+    "maroon", "violet", "indigo", "turquoise", "lime", "olive",
+    "teal", "aqua", "magenta", "silver", "gold", "beige", "tan",
+})
+
+_TOKEN_RE = re.compile(r"\b[a-z]{3,}\b")
+# Sentence punctuation trimmed from the object word of a "color object" pair.
+_PAIR_PUNCTUATION = ".,;:!?\"'()[]"
+_JSON_RE = re.compile(r"\{[\s\S]*\}")
+
+
+# Intents extracted from Gemini replies, keyed by normalised query text.
+_gemini_intent_cache: TTLCache = TTLCache(maxsize=1024, ttl=3600)
 
 
 @app.post("/api/intent", response_model=IntentResponse)
@@ -170,151 +256,201 @@ async def parse_intent(payload: IntentRequest) -> IntentResponse:
     if not query:
         return IntentResponse(targets=[], colors=[], pairs=[])
 
-    targets: List[str] = []
-    colors: List[str] = []
-    pairs: List[dict] = []
-
-    if settings.gemini_api_key:
-        prompt = (
-            "You extract computer-vision detection intents from natural language.\n"
-            'Respond ONLY with a JSON object shaped like {"pairs": [{"object": "shirt", "color": "blue"}, {"object": "glasses", "color": "black"}]} for queries with specific object-color combinations.\n'
-            'Use lowercase singular nouns (e.g., "person", "car", "laptop"). For colors, use basic color names (e.g., "red", "blue", "green", "yellow", "black", "white", "gray", "orange", "purple", "pink", "cyan").\n'
-            'Example: "find a person wearing a blue shirt and black glasses" -> {"pairs": [{"object": "shirt", "color": "blue"}, {"object": "glasses", "color": "black"}]}\n'
-            'Example: "find a red car" -> {"pairs": [{"object": "car", "color": "red"}]}\n'
-            'Example: "find a person" -> {"pairs": [{"object": "person", "color": null}]}\n'
-            'If a color is specified for an object, include it in the pair. If no color, set color to null.\n'
-            'Omit unrelated words.\n'
-            f"User request: \"{query}\"\n"
-            "JSON response:"
+    cache_key = query.lower()
+
+    if get_settings().gemini_api_key:
+        intent = _gemini_intent_cache.get(cache_key)
+        if intent is None:
+            parsed_json = await _request_gemini_intent(query)
+            if parsed_json is not None:
+                intent = _intent_from_gemini(parsed_json)
+                _gemini_intent_cache[cache_key] = intent
+        if intent is not None and any(intent):
+            targets, colors, pairs = intent
+            return IntentResponse(
+                targets=list(targets),
+                colors=list(colors),
+                pairs=[{"object": obj, "color": color} for obj, color in pairs],
+            )
+
+    # Fallback: extract colors and targets from query using pattern matching.
+    # The helper already returns sorted, stopword-free, de-duplicated values.
+    fallback_targets, fallback_colors, fallback_pairs = _fallback_intent(cache_key)
+    return IntentResponse(
+        targets=list(fallback_targets),
+        colors=list(fallback_colors),
+        pairs=[{"object": obj, "color": color} for obj, color in fallback_pairs],
+    )
+
+
+async def _request_gemini_intent(query: str) -> Optional[dict]:
+    """Ask Gemini to extract detection intents and return its parsed JSON reply."""
+    prompt = (
+        "You extract computer-vision detection intents from natural language.\n"
+        'Respond ONLY with a JSON object shaped like {"pairs": [{"object": "shirt", "color": "blue"}, {"object": "glasses", "color": "black"}]} for queries with specific object-color combinations.\n'
+        'Use lowercase singular nouns (e.g., "person", "car", "laptop"). For colors, use basic color names (e.g., "red", "blue", "green", "yellow", "black", "white", "gray", "orange", "purple", "pink", "cyan").\n'
+        'Example: "find a person wearing a blue shirt and black glasses" -> {"pairs": [{"object": "shirt", "color": "blue"}, {"object": "glasses", "color": "black"}]}\n'
+        'Example: "find a red car" -> {"pairs": [{"object": "car", "color": "red"}]}\n'
+        'Example: "find a person" -> {"pairs": [{"object": "person", "color": null}]}\n'
+        'If a color is specified for an object, include it in the pair. If no color, set color to null.\n'
+        'Omit unrelated words.\n'
+        f"User request: \"{query}\"\n"
+        "JSON response:"
+    )
+
+    try:
+        response = await _get_gemini_client().post(
+            GEMINI_URL,
+            params={"key": get_settings().gemini_api_key},
+            json={
+                "contents": [
+                    {
+                        "role": "user",
+                        "parts": [{"text": prompt}],
+                    }
+                ],
+                "safetySettings": [
+                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+                    {"category": "HARM_CATEGORY_SEXUAL", "threshold": "BLOCK_NONE"},
+                    {"category": "HARM_CATEGORY_DANGEROUS", "threshold": "BLOCK_NONE"},
+                ],
+            },
         )
 
+        if response.status_code != 200:
+            logger.warning(
+                "Gemini API returned status %s: %s",
+                response.status_code,
+                response.text,
+            )
+            return None
+
+        data = orjson.loads(response.content)
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.post(
-                    "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent",
-                    params={"key": settings.gemini_api_key},
-                    json={
-                        "contents": [
-                            {
-                                "role": "user",
-                                "parts": [{"text": prompt}],
-                            }
-                        ],
-                        "safetySettings": [
-                            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                            {"category": "HARM_CATEGORY_SEXUAL", "threshold": "BLOCK_NONE"},
-                            {"category": "HARM_CATEGORY_DANGEROUS", "threshold": "BLOCK_NONE"},
-                        ],
-                    },
-                )
-
-            if response.status_code == 200:
-                data = response.json()
-                text = (
-                    data.get("candidates", [{}])[0]
-                    .get("content", {})
-                    .get("parts", [{}])[0]
-                    .get("text", "")
-                )
-                if not text:
-                    text = data.get("candidates", [{}])[0].get("outputText", "")
-
-                match = re.search(r"\{[\s\S]*\}", text or "")
-                if match:
-                    try:
-                        parsed_json = json.loads(match.group(0))
-                        
-                        # Extract pairs if available
-                        candidate_pairs = parsed_json.get("pairs", [])
-                        if isinstance(candidate_pairs, list):
-                            for pair in candidate_pairs:
-                                if isinstance(pair, dict):
-                                    obj = pair.get("object", "").strip().lower()
-                                    color = pair.get("color", "")
-                                    if color:
-                                        color = color.strip().lower()
-                                    
-                                    if obj:
-                                        if color and color != "null":
-                                            pairs.append({"object": obj, "color": color})
-                                            targets.append(obj)
-                                            colors.append(color)
-                                        else:
-                                            targets.append(obj)
-                        
-                        # Fallback: also check for old format
-                        if not pairs:
-                            candidate_targets = parsed_json.get("targets", [])
-                            if isinstance(candidate_targets, list):
-                                targets.extend(
-                                    target.strip().lower()
-                                    for target in candidate_targets
-                                    if isinstance(target, str) and target.strip()
-                                )
-                            
-                            candidate_colors = parsed_json.get("colors", [])
-                            if isinstance(candidate_colors, list):
-                                colors.extend(
-                                    color.strip().lower()
-                                    for color in candidate_colors
-                                    if isinstance(color, str) and color.strip()
-                                )
-                    except json.JSONDecodeError as exc:  # pragma: no cover - malformed model reply
-                        logger.warning("Failed to decode Gemini intent JSON: %s", exc)
-            else:
-                logger.warning(
-                    "Gemini API returned status %s: %s",
-                    response.status_code,
-                    response.text,
-                )
-        except Exception:  # pragma: no cover - network failure, etc.
-            logger.exception("Gemini intent extraction failed")
-
-    # Fallback: extract colors and targets from query using pattern matching
-    if not targets and not colors and not pairs:
-        tokens = re.findall(r"\b[a-z]{3,}\b", query.lower())
-        
-        # Common color names
-        color_keywords = {
-            "red", "blue", "green", "yellow", "orange", "purple", "pink",
-            "black", "white", "gray", "grey", "brown", "cyan", "navy",
-            "maroon", "violet", "indigo", "turquoise", "lime", "olive",
-            "teal", "aqua", "magenta", "silver", "gold", "beige", "tan",
-        }
-        
-        # Try to extract color-object pairs using simple pattern matching
-        # Pattern: "color object" (e.g., "blue shirt", "black glasses")
-        words = query.lower().split()
-        for i in range(len(words) - 1):
-            if words[i] in color_keywords and words[i+1] not in STOPWORDS and words[i+1] not in color_keywords:
-                pairs.append({"object": words[i+1], "color": words[i]})
-                targets.append(words[i+1])
-                colors.append(words[i])
-        
-        # If no pairs found, extract colors and targets separately
-        if not pairs:
-            for token in tokens:
-                if token in color_keywords:
-                    colors.append(token)
-                elif token not in STOPWORDS:
-                    targets.append(token)
-        
-        targets = sorted(set(targets))
-        colors = sorted(set(colors))
-    
-    # Clean up results
-    targets = sorted({target for target in targets if target and target not in STOPWORDS})
-    colors = sorted(set(colors))
+            text = data["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            text = ""
+        if not text:
+            try:
+                text = data["candidates"][0]["outputText"]
+            except (KeyError, IndexError, TypeError):
+                return None
+        if not isinstance(text, str):
+            return None
+
+        # The prompt asks for bare JSON; only scan for an embedded object when
+        # the model wrapped it in prose or code fences.
+        try:
+            parsed_json = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            match = _JSON_RE.search(text)
+            if not match:
+                return None
+            try:
+                parsed_json = orjson.loads(match.group(0))
+            except orjson.JSONDecodeError as exc:  # pragma: no cover - malformed model reply
+                logger.warning("Failed to decode Gemini intent JSON: %s", exc)
+                return None
+        return parsed_json if isinstance(parsed_json, dict) else None
+    except Exception:  # pragma: no cover - network failure, etc.
+        logger.exception("Gemini intent extraction failed")
+        return None
+
+
+def _intent_from_gemini(
+    parsed_json: dict,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[Tuple[str, str], ...]]:
+    """
+    Pull targets, colors and de-duplicated object/color pairs out of a Gemini reply.
+
+    Values of the wrong type are skipped rather than trusted, so a malformed
+    reply yields an empty intent instead of an error. Returns the same
+    immutable shape as ``_fallback_intent`` so the result can be cached.
+    """
+    targets: Set[str] = set()
+    colors: Set[str] = set()
+    pairs: List[Tuple[str, str]] = []
+
+    # Extract pairs if available
+    candidate_pairs = parsed_json.get("pairs", [])
+    if isinstance(candidate_pairs, list):
+        for pair in candidate_pairs:
+            if not isinstance(pair, dict):
+                continue
+            obj = pair.get("object")
+            if not isinstance(obj, str) or not obj.strip():
+                continue
+            obj = obj.strip().lower()
+            targets.add(obj)
+
+            color = pair.get("color")
+            if isinstance(color, str):
+                color = color.strip().lower()
+                if color and color != "null":
+                    colors.add(color)
+                    if (obj, color) not in pairs:
+                        pairs.append((obj, color))
     
-    # Remove duplicates from pairs
-    unique_pairs = []
-    seen = set()
-    for pair in pairs:
-        key = (pair.get("object", ""), pair.get("color", ""))
-        if key not in seen:
-            seen.add(key)
-            unique_pairs.append(pair)
-    pairs = unique_pairs
-
-    return IntentResponse(targets=targets, colors=colors, pairs=pairs)
+    # Fallback: also check for old format
+    if not pairs:
+        candidate_targets = parsed_json.get("targets", [])
+        if isinstance(candidate_targets, list):
+            targets.update(
+                target.strip().lower()
+                for target in candidate_targets
+                if isinstance(target, str) and target.strip()
+            )
+        
+        candidate_colors = parsed_json.get("colors", [])
+        if isinstance(candidate_colors, list):
+            colors.update(
+                color.strip().lower()
+                for color in candidate_colors
+                if isinstance(color, str) and color.strip()
+            )
+
+    return tuple(sorted(targets - STOPWORDS)), tuple(sorted(colors)), tuple(pairs)
+
+
+@lru_cache(maxsize=2048)
+def _fallback_intent(
+    query_lower: str,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[Tuple[str, str], ...]]:
+    """
+    Extract intents from a lowercased query without calling Gemini.
+
+    Returns immutable ``(targets, colors, pairs)`` so cached results cannot be
+    modified by callers.
+    """
+    # Pattern: "color object" (e.g. "blue shirt", "black glasses"). Pairs are
+    # read from whitespace-separated words so objects keep hyphens and digits
+    # ("t-shirt", "car2") and short names ("tv") are not dropped.
+    pairs: List[Tuple[str, str]] = []
+    words = query_lower.split()
+    for color, word in zip(words, words[1:]):
+        if color not in COLOR_KEYWORDS:
+            continue
+        obj = word.strip(_PAIR_PUNCTUATION)
+        if obj and obj not in STOPWORDS and obj not in COLOR_KEYWORDS:
+            pair = (obj, color)
+            if pair not in pairs:
+                pairs.append(pair)
+
+    if pairs:
+        return (
+            tuple(sorted({obj for obj, _ in pairs})),
+            tuple(sorted({color for _, color in pairs})),
+            tuple(pairs),
+        )
+
+    # If no pairs found, extract colors and targets separately in one pass.
+    targets: Set[str] = set()
+    colors: Set[str] = set()
+    for token in _TOKEN_RE.findall(query_lower):
+        if token in COLOR_KEYWORDS:
+            colors.add(token)
+        elif token not in STOPWORDS:
+            targets.add(token)
+
+    return tuple(sorted(targets)), tuple(sorted(colors)), ()
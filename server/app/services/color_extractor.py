@@ -13,65 +13,135 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Largest side, in pixels, that a ROI is downscaled to before classification.
+MAX_DIMENSION = 64
+# ROIs with fewer pixels than this are too small to give a meaningful color.
+MIN_PIXELS = 100
 
-# Define color ranges in HSV space with their names
+
+# Color ranges in HSV space, one row per range, with the color name for each
+# row in _NAMES. Rows are checked in order, so earlier rows take precedence.
 # HSV ranges: Hue (0-180), Saturation (0-255), Value (0-255)
-COLOR_RANGES = {
-    "red": [
-        # Red wraps around in HSV, so we need two ranges
-        {"lower": np.array([0, 50, 50]), "upper": np.array([10, 255, 255])},
-        {"lower": np.array([170, 50, 50]), "upper": np.array([180, 255, 255])},
-    ],
-    "orange": [
-        {"lower": np.array([11, 50, 50]), "upper": np.array([25, 255, 255])},
-    ],
-    "yellow": [
-        {"lower": np.array([26, 50, 50]), "upper": np.array([35, 255, 255])},
-    ],
-    "green": [
-        {"lower": np.array([36, 50, 50]), "upper": np.array([85, 255, 255])},
-    ],
-    "cyan": [
-        {"lower": np.array([86, 50, 50]), "upper": np.array([95, 255, 255])},
-    ],
-    "blue": [
-        {"lower": np.array([96, 50, 50]), "upper": np.array([130, 255, 255])},
-    ],
-    "purple": [
-        {"lower": np.array([131, 50, 50]), "upper": np.array([155, 255, 255])},
-    ],
-    "pink": [
-        {"lower": np.array([156, 50, 50]), "upper": np.array([169, 255, 255])},
-    ],
-    "white": [
-        {"lower": np.array([0, 0, 200]), "upper": np.array([180, 30, 255])},
+_LOWERS = np.array(
+    [
+        [0, 50, 50],  # red (red wraps around in HSV, so it needs two ranges)
+        [170, 50, 50],  # red
+        [11, 50, 50],  # orange
+        [26, 50, 50],  # yellow
+        [36, 50, 50],  # green
+        [86, 50, 50],  # cyan
+        [96, 50, 50],  # blue
+        [131, 50, 50],  # purple
+        [156, 50, 50],  # pink
+        [0, 0, 200],  # white
+        [0, 0, 0],  # black
+        [0, 0, 51],  # gray
     ],
-    "black": [
-        {"lower": np.array([0, 0, 0]), "upper": np.array([180, 255, 50])},
+    dtype=np.uint8,
+)
+_UPPERS = np.array(
+    [
+        [10, 255, 255],
+        [180, 255, 255],
+        [25, 255, 255],
+        [35, 255, 255],
+        [85, 255, 255],
+        [95, 255, 255],
+        [130, 255, 255],
+        [155, 255, 255],
+        [169, 255, 255],
+        [180, 30, 255],
+        [180, 255, 50],
+        [180, 30, 199],
     ],
-    "gray": [
-        {"lower": np.array([0, 0, 51]), "upper": np.array([180, 30, 199])},
-    ],
-}
+    dtype=np.uint8,
+)
+_NAMES: Tuple[str, ...] = (
+    "red",
+    "red",
+    "orange",
+    "yellow",
+    "green",
+    "cyan",
+    "blue",
+    "purple",
+    "pink",
+    "white",
+    "black",
+    "gray",
+)
+
+# Hue cut-offs for saturated pixels that fall between the ranges above, as
+# (exclusive upper bound, color name) in increasing hue order.
+_HUE_FALLBACK = (
+    (10, "red"),
+    (25, "orange"),
+    (35, "yellow"),
+    (85, "green"),
+    (95, "cyan"),
+    (130, "blue"),
+    (155, "purple"),
+    (170, "pink"),
+    (180, "red"),
+)
+
+_COLOR_NAMES: Tuple[str, ...] = tuple(dict.fromkeys(_NAMES))
+_COLOR_IDS = {name: idx for idx, name in enumerate(_COLOR_NAMES)}
+
+
+def _build_color_lut() -> np.ndarray:
+    """
+    Build a lookup table mapping every OpenCV HSV triplet to a color index.
+
+    The table is indexed as ``lut[h, s, v]`` (H 0-179, S/V 0-255) and gives the
+    same answer as checking the ``_LOWERS``/``_UPPERS`` rows in order and then
+    falling back to the saturation/value and hue rules for pixels outside
+    every range.
+    """
+    lut = np.empty((180, 256, 256), dtype=np.uint8)
+
+    # Fallback for saturated pixels: classify by hue alone.
+    start = 0
+    for end, color_name in _HUE_FALLBACK:
+        lut[start:end] = _COLOR_IDS[color_name]
+        start = end
+
+    # Fallback for low-saturation pixels: classify by value alone.
+    lut[:, :30, :] = _COLOR_IDS["gray"]
+    lut[:, :30, 201:] = _COLOR_IDS["white"]
+    lut[:, :30, :50] = _COLOR_IDS["black"]
+
+    # Explicit ranges win, and earlier rows take precedence over later ones,
+    # so paint them last-to-first.
+    rows = list(zip(_LOWERS.tolist(), _UPPERS.tolist(), _NAMES))
+    for (h_lo, s_lo, v_lo), (h_hi, s_hi, v_hi), color_name in reversed(rows):
+        lut[h_lo : h_hi + 1, s_lo : s_hi + 1, v_lo : v_hi + 1] = _COLOR_IDS[color_name]
+
+    return lut
+
+
+_COLOR_LUT = _build_color_lut()
 
 
 def extract_dominant_color(
     frame: np.ndarray,
     bbox: List[float],
-    k: int = 3,
 ) -> Tuple[Optional[str], Optional[List[int]]]:
     """
     Extract the dominant color from a bounding box region in a frame.
 
+    Every pixel in the region is classified into one of the named colors and
+    the most frequent one wins.
+
     Args:
         frame: The full frame image (BGR format from OpenCV)
         bbox: Bounding box coordinates [x1, y1, x2, y2]
-        k: Number of clusters for k-means (default: 3)
 
     Returns:
         Tuple of (color_name, rgb_values) where:
         - color_name is a human-readable color string (e.g., "red", "blue")
-        - rgb_values is a list of [R, G, B] values for the dominant color
+        - rgb_values is a list of [R, G, B] values averaged over the pixels
+          of the dominant color
         Returns (None, None) if extraction fails
     """
     try:
@@ -94,55 +164,45 @@ def extract_dominant_color(
         roi = frame[y1:y2, x1:x2]
         
         # Check if ROI is too small
-        if roi.size == 0 or roi.shape[0] < 5 or roi.shape[1] < 5:
+        if (
+            roi.shape[0] < 5
+            or roi.shape[1] < 5
+            or roi.shape[0] * roi.shape[1] < MIN_PIXELS
+        ):
             logger.debug("ROI too small for color extraction")
             return None, None
         
-        # Resize if ROI is very large (for performance)
-        max_dimension = 200
-        if roi.shape[0] > max_dimension or roi.shape[1] > max_dimension:
-            scale = max_dimension / max(roi.shape[0], roi.shape[1])
-            new_width = int(roi.shape[1] * scale)
-            new_height = int(roi.shape[0] * scale)
-            roi = cv2.resize(roi, (new_width, new_height))
+        # Downscale large ROIs; a few thousand pixels give the same dominant
+        # color as the full crop. INTER_AREA is the cheap, alias-free choice
+        # for shrinking.
+        if roi.shape[0] > MAX_DIMENSION or roi.shape[1] > MAX_DIMENSION:
+            scale = MAX_DIMENSION / max(roi.shape[0], roi.shape[1])
+            new_width = max(int(roi.shape[1] * scale), 1)
+            new_height = max(int(roi.shape[0] * scale), 1)
+            roi = cv2.resize(roi, (new_width, new_height), interpolation=cv2.INTER_AREA)
         
         # Convert to HSV for better color detection
         hsv_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
         
-        # Reshape to a list of pixels
-        pixels = hsv_roi.reshape(-1, 3).astype(np.float32)
-        
-        # Apply k-means clustering to find dominant colors
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
-        _, labels, centers = cv2.kmeans(
-            pixels, k, None, criteria, 10, cv2.KMEANS_PP_CENTERS
-        )
-        
-        # Count pixels in each cluster
-        unique, counts = np.unique(labels, return_counts=True)
+        # Classify each pixel through the palette table and count per color
+        color_ids = _COLOR_LUT[hsv_roi[..., 0], hsv_roi[..., 1], hsv_roi[..., 2]]
+        counts = np.bincount(color_ids.ravel(), minlength=len(_COLOR_NAMES))
+        dominant_id = int(np.argmax(counts))
+        color_name = _COLOR_NAMES[dominant_id]
         
-        # Get the most dominant cluster
-        dominant_cluster_idx = unique[np.argmax(counts)]
-        dominant_color_hsv = centers[dominant_cluster_idx].astype(np.uint8)
-        
-        # Convert HSV back to BGR then to RGB
-        dominant_color_bgr = cv2.cvtColor(
-            np.uint8([[dominant_color_hsv]]), cv2.COLOR_HSV2BGR
-        )[0][0]
+        # Average the pixels of the winning color for a representative RGB
+        mean_bgr = roi[color_ids == dominant_id].mean(axis=0)
         dominant_color_rgb = [
-            int(dominant_color_bgr[2]),  # R
-            int(dominant_color_bgr[1]),  # G
-            int(dominant_color_bgr[0]),  # B
+            int(mean_bgr[2]),  # R
+            int(mean_bgr[1]),  # G
+            int(mean_bgr[0]),  # B
         ]
         
-        # Map HSV color to color name
-        color_name = _hsv_to_color_name(dominant_color_hsv)
-        
         logger.debug(
-            "Extracted color: %s (RGB: %s, HSV: %s)",
+            "Extracted color: %s (RGB: %s, share: %.2f)",
             color_name,
             dominant_color_rgb,
-            dominant_color_hsv.tolist(),
+            counts[dominant_id] / color_ids.size,
         )
         
         return color_name, dominant_color_rgb
@@ -152,57 +212,6 @@ def extract_dominant_color(
         return None, None
 
 
-def _hsv_to_color_name(hsv: np.ndarray) -> str:
-    """
-    Convert HSV color to a human-readable color name.
-
-    Args:
-        hsv: HSV color values as numpy array [H, S, V]
-
-    Returns:
-        Color name as string (e.g., "red", "blue", "green")
-    """
-    # Check each color range
-    for color_name, ranges in COLOR_RANGES.items():
-        for color_range in ranges:
-            lower = color_range["lower"]
-            upper = color_range["upper"]
-            
-            # Check if the HSV value falls within this range
-            if np.all(hsv >= lower) and np.all(hsv <= upper):
-                return color_name
-    
-    # If no match found, determine based on saturation and value
-    h, s, v = hsv
-    
-    # Low saturation colors
-    if s < 30:
-        if v > 200:
-            return "white"
-        elif v < 50:
-            return "black"
-        else:
-            return "gray"
-    
-    # High saturation colors - determine by hue
-    if h < 10 or h >= 170:
-        return "red"
-    elif h < 25:
-        return "orange"
-    elif h < 35:
-        return "yellow"
-    elif h < 85:
-        return "green"
-    elif h < 95:
-        return "cyan"
-    elif h < 130:
-        return "blue"
-    elif h < 155:
-        return "purple"
-    else:
-        return "pink"
-
-
 def color_matches(detected_color: Optional[str], query_color: str) -> bool:
     """
     Check if a detected color matches a query color with STRICT matching.
@@ -1,36 +1,97 @@
 from __future__ import annotations
-import base64
+import binascii
+import itertools
+import json
 import logging
 import math
+import os
+import platform
+import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import cv2
 import numpy as np
-from ultralytics import YOLO
 
-try:  # Torch 2.6+ safe loading support
-    from torch.serialization import add_safe_globals
-except ImportError:  # pragma: no cover - older torch versions
-    add_safe_globals = None  # type: ignore[assignment]
+try:  # Optional NVDEC-accelerated decoding
+    import ffmpegcv
+except ImportError:  # pragma: no cover - optional dependency
+    ffmpegcv = None  # type: ignore[assignment]
 
-try:
-    from ultralytics.nn.tasks import DetectionModel
-except ImportError:  # pragma: no cover - defensive
-    DetectionModel = None  # type: ignore[assignment]
+from ..config import get_settings
+from .color_extractor import extract_dominant_color
+from .pipeline import BackgroundReader, BackgroundWorker
+from .video_reader import PyAVCapture, av, probe_keyframe_interval
+
+logger = logging.getLogger(__name__)
+
+JPEG_QUALITY = 80
+
+
+@lru_cache(maxsize=None)
+def _configure_runtime() -> None:
+    """
+    Tune torch and OpenCV once, when the first detector is built.
+
+    cuDNN picks the fastest convolution algorithm for each input shape. On
+    CPU, torch and OpenCV (decoding, color extraction) share the cores, so
+    each gets half instead of both sizing their pools to the whole machine.
+    """
+    import torch
+
+    worker_threads = max(1, (os.cpu_count() or 2) // 2)
+    torch.backends.cudnn.benchmark = True
+    if not torch.cuda.is_available():
+        torch.set_num_threads(worker_threads)
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(worker_threads)
+
+
+@lru_cache(maxsize=None)
+def _load_yolo() -> type:
+    """
+    Import Ultralytics on first use and return the ``YOLO`` class.
+
+    Importing ultralytics is slow, so it is deferred until a model is
+    actually built rather than paid by every importer of this module.
+    """
+    from ultralytics import YOLO
+
+    try:  # Torch 2.6+ safe loading support
+        from torch.serialization import add_safe_globals
+    except ImportError:  # pragma: no cover - older torch versions
+        add_safe_globals = None  # type: ignore[assignment]
 
-if add_safe_globals and DetectionModel:
     try:
-        add_safe_globals([DetectionModel])
-    except Exception:  # pragma: no cover - guard against API differences
-        logging.getLogger(__name__).warning(
-            "Failed to register DetectionModel with torch.safe_globals"
-        )
+        from ultralytics.nn.tasks import DetectionModel
+    except ImportError:  # pragma: no cover - defensive
+        DetectionModel = None  # type: ignore[assignment]
 
-from ..config import settings
-from .color_extractor import extract_dominant_color
+    if add_safe_globals and DetectionModel:
+        try:
+            add_safe_globals([DetectionModel])
+        except Exception:  # pragma: no cover - guard against API differences
+            logger.warning("Failed to register DetectionModel with torch.safe_globals")
+
+    return YOLO
 
-logger = logging.getLogger(__name__)
+
+def _read_engine_metadata(engine_path: Path) -> Dict[str, object]:
+    """
+    Read the JSON header Ultralytics writes in front of TensorRT engines.
+
+    Returns an empty dict for engines built without it.
+    """
+    try:
+        with engine_path.open("rb") as engine_file:
+            meta_len = int.from_bytes(engine_file.read(4), byteorder="little")
+            if not 0 < meta_len < 1 << 20:
+                return {}
+            metadata = json.loads(engine_file.read(meta_len).decode("utf-8"))
+    except (OSError, UnicodeDecodeError, ValueError):
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
 
 
 @dataclass
@@ -76,21 +137,216 @@ class FrameDetections:
         return payload
 
 
+def _skip_frame(capture: object) -> bool:
+    """Advance past one frame, without converting it when the reader allows."""
+    grab = getattr(capture, "grab", None)
+    if grab is not None:
+        return bool(grab())
+    ret, _ = capture.read()
+    return bool(ret)
+
+
 class DetectionService:
     """
     Loads a YOLO model and performs inference on sampled frames from a video.
     """
 
-    def __init__(self, model_path: str | Path, default_min_conf: float) -> None:
+    def __init__(
+        self,
+        model_path: str | Path,
+        default_min_conf: float,
+        default_batch_size: int = 8,
+        engine_path: str | Path | None = None,
+        image_size: int = 640,
+        int8_engine_path: str | Path | None = None,
+        use_nvdec: bool = False,
+        use_pyav: bool = False,
+        pyav_hwaccel: Optional[str] = None,
+        prefetch_frames: Optional[int] = None,
+        warmup: bool = False,
+        warmup_size: Tuple[int, int] = (1280, 720),
+        half: bool = False,
+    ) -> None:
+        _configure_runtime()
         model_path = Path(model_path)
+        # Ultralytics fixes the precision when it builds its predictor on the
+        # first call, so FP16 is a per-service setting, not a per-request one.
+        self.half = half and self._supports_half()
+        if half and not self.half:
+            logger.warning("YOLO_HALF is set but no FP16-capable GPU was found; using FP32")
+        # None sizes the reader queue from the batch size per request.
+        self.prefetch_frames = (
+            max(int(prefetch_frames), 1) if prefetch_frames is not None else None
+        )
+        self.use_nvdec = use_nvdec
+        if use_nvdec and ffmpegcv is None:
+            logger.warning("USE_NVDEC is set but ffmpegcv is not installed; using OpenCV")
+            self.use_nvdec = False
+        self.use_pyav = use_pyav
+        self.pyav_hwaccel = pyav_hwaccel
+        if use_pyav and av is None:
+            logger.warning("USE_PYAV is set but PyAV is not installed; using OpenCV")
+            self.use_pyav = False
+        self.default_min_conf = default_min_conf
+        self.default_batch_size = max(int(default_batch_size), 1)
+        self.image_size = image_size
+        # Exported models are built for a fixed maximum batch; None means the
+        # model accepts any batch size.
+        self.max_batch_size: Optional[int] = None
+        self._class_names: Optional[List[str]] = None
+
+        if int8_engine_path is not None:
+            weights_path = Path(int8_engine_path)
+            if not weights_path.exists():
+                raise FileNotFoundError(
+                    f"INT8 TensorRT engine not found at '{weights_path.resolve()}'; "
+                    "build it with 'python -m scripts.quantize --video <calibration video>'"
+                )
+            self.max_batch_size = self.default_batch_size
+            self._fit_to_engine(weights_path)
+        elif engine_path is not None:
+            self.max_batch_size = self.default_batch_size
+            weights_path = self._ensure_engine(model_path, Path(engine_path))
+        else:
+            if not model_path.exists():
+                raise FileNotFoundError(
+                    f"YOLO model weights not found at '{model_path.resolve()}'"
+                )
+            weights_path = model_path
+
+        logger.info("Loading YOLO model from %s", weights_path)
+        self.model = _load_yolo()(str(weights_path))
+
+        if warmup:
+            self.warmup(warmup_size)
+
+    def warmup(self, frame_size: Tuple[int, int] = (1280, 720)) -> None:
+        """
+        Run one dummy batch of ``(width, height)`` frames through the model.
+
+        This moves lazy initialisation and cuDNN autotuning to startup instead
+        of the first real request. PyTorch weights letterbox same-shape
+        batches to the smallest stride-aligned rectangle (384x640 for 16:9 at
+        640), and cuDNN tunes per input shape, so the dummy frames should have
+        the aspect ratio of the footage being served.
+        """
+        width, height = frame_size
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        batch_size = min(self.default_batch_size, self.max_batch_size or self.default_batch_size)
+        self.model(
+            [dummy] * batch_size,
+            verbose=False,
+            imgsz=self.image_size,
+            half=self.half,
+        )
+        logger.info("YOLO model warmed up (batch=%d, frame=%dx%d)", batch_size, width, height)
+
+    @staticmethod
+    def _supports_half() -> bool:
+        """FP16 inference only pays off on tensor-core GPUs (compute capability 7.0+)."""
+        import torch
+
+        if not torch.cuda.is_available():
+            return False
+        return torch.cuda.get_device_capability() >= (7, 0)
+
+    def _fit_to_engine(self, engine_path: Path) -> None:
+        """Clamp the batch size and image size to what a prebuilt engine supports."""
+        metadata = _read_engine_metadata(engine_path)
+        engine_batch = metadata.get("batch")
+        if engine_batch and int(engine_batch) < self.default_batch_size:
+            logger.warning(
+                "Engine '%s' was built for batch %d; capping batches at that instead of %d",
+                engine_path,
+                int(engine_batch),
+                self.default_batch_size,
+            )
+            self.max_batch_size = int(engine_batch)
+
+        engine_imgsz = metadata.get("imgsz")
+        if engine_imgsz and max(engine_imgsz) != self.image_size:
+            logger.warning(
+                "Engine '%s' was built for imgsz %s; using that instead of %d",
+                engine_path,
+                engine_imgsz,
+                self.image_size,
+            )
+            self.image_size = int(max(engine_imgsz))
+
+    def _engine_is_stale(self, engine_path: Path) -> bool:
+        """Whether a cached engine was built for a smaller batch or another image size."""
+        metadata = _read_engine_metadata(engine_path)
+        engine_batch = metadata.get("batch")
+        engine_imgsz = metadata.get("imgsz")
+        if engine_batch is None or engine_imgsz is None:
+            # Engines without Ultralytics metadata cannot be checked; trust them.
+            return False
+        return int(engine_batch) < self.default_batch_size or max(engine_imgsz) != self.image_size
+
+    @staticmethod
+    def _export_target(
+        model_path: Path, engine_path: Path, image_size: int
+    ) -> Tuple[str, Path]:
+        """
+        Pick the fastest export format the current machine can run.
+
+        TensorRT needs a CUDA GPU; Apple Silicon gets CoreML and everything
+        else falls back to ONNX Runtime on the CPU. CoreML packages have a fixed
+        input size, so theirs is part of the file name; ONNX exports are dynamic.
+        """
+        import torch
+
+        if torch.cuda.is_available():
+            return "engine", engine_path
+        if sys.platform == "darwin" and platform.machine() == "arm64":
+            return "coreml", model_path.with_name(f"{model_path.stem}-{image_size}.mlpackage")
+        return "onnx", model_path.with_suffix(".onnx")
+
+    def _ensure_engine(self, model_path: Path, engine_path: Path) -> Path:
+        """Export ``model_path`` for accelerated inference unless a cached export exists."""
+        export_format, export_path = self._export_target(
+            model_path, engine_path, self.image_size
+        )
+        if export_format == "coreml":
+            # CoreML packages are exported for single-image inference.
+            self.max_batch_size = 1
+
+        if export_path.exists():
+            if export_format != "engine" or not self._engine_is_stale(export_path):
+                return export_path
+            logger.info(
+                "Cached engine '%s' does not match batch=%d, imgsz=%d; rebuilding it",
+                export_path,
+                self.default_batch_size,
+                self.image_size,
+            )
+
         if not model_path.exists():
             raise FileNotFoundError(
-                f"YOLO model weights not found at '{model_path.resolve()}'"
+                f"Neither exported model '{export_path.resolve()}' nor YOLO model "
+                f"weights '{model_path.resolve()}' were found"
             )
 
-        logger.info("Loading YOLO model from %s", model_path)
-        self.model = YOLO(str(model_path))
-        self.default_min_conf = default_min_conf
+        export_kwargs: Dict[str, object] = {"imgsz": self.image_size}
+        if export_format == "engine":
+            export_kwargs.update(half=True, dynamic=True, batch=self.default_batch_size)
+        elif export_format == "onnx":
+            export_kwargs.update(dynamic=True, simplify=True)
+        else:
+            export_kwargs.update(half=True)
+
+        logger.info(
+            "Exporting %s to %s (imgsz=%d); this runs once",
+            model_path,
+            export_format,
+            self.image_size,
+        )
+        yolo = _load_yolo()(str(model_path))
+        exported_path = Path(yolo.export(format=export_format, **export_kwargs))
+        if exported_path.resolve() != export_path.resolve():
+            export_path.parent.mkdir(parents=True, exist_ok=True)
+            exported_path.replace(export_path)
+        return export_path
 
     def process_video(
         self,
@@ -99,34 +355,36 @@ class DetectionService:
         min_confidence: Optional[float] = None,
         target_object: Optional[str] = None,
         max_frames: Optional[int] = None,
+        batch_size: Optional[int] = None,
     ) -> Dict[str, object]:
         video_path = Path(video_path)
         if not video_path.exists():
             raise FileNotFoundError(f"Video file not found at {video_path}")
 
+        # Validate before opening the capture: NVDEC and PyAV readers hold an
+        # ffmpeg process or container that only the try/finally below releases.
+        if frame_interval_seconds <= 0:
+            raise ValueError("frame_interval_seconds must be greater than 0")
+
         confidence_threshold = (
             min_confidence if min_confidence is not None else self.default_min_conf
         )
+        batch_size = max(int(batch_size or self.default_batch_size), 1)
+        if self.max_batch_size is not None:
+            batch_size = min(batch_size, self.max_batch_size)
 
         logger.info(
-            "Processing video '%s' (frame_interval=%.2fs, min_conf=%.2f, target=%s)",
+            "Processing video '%s' (frame_interval=%.2fs, min_conf=%.2f, target=%s, batch=%d)",
             video_path.name,
             frame_interval_seconds,
             confidence_threshold,
             target_object or "*",
+            batch_size,
         )
 
-        capture = cv2.VideoCapture(str(video_path))
-        if not capture.isOpened():
-            raise RuntimeError(f"Unable to open video file: {video_path}")
-
-        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
-        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+        capture, fps, total_frames, seekable = self._open_capture(video_path)
         duration = total_frames / fps if fps else 0.0
 
-        if frame_interval_seconds <= 0:
-            raise ValueError("frame_interval_seconds must be greater than 0")
-
         if fps <= 0:
             # Fallback to 30 fps if metadata missing
             fps = 30.0
@@ -135,62 +393,69 @@ class DetectionService:
 
         detections: List[FrameDetections] = []
         target_hits: List[Dict[str, object]] = []
+        # Class names are stored lowercased, so normalise the target once here.
+        target_lc = target_object.lower() if target_object else None
 
-        frame_index = 0
-        processed_frames = 0
+        seek = seekable and total_frames > 0 and self._should_seek(video_path, frame_step)
+        sampled_frames: Iterator[Tuple[int, np.ndarray]] = self._iter_sampled_frames(
+            capture, frame_step, total_frames if seek else 0
+        )
+        if max_frames:
+            sampled_frames = itertools.islice(sampled_frames, max_frames)
 
-        try:
-            while True:
-                ret, frame = capture.read()
-                if not ret:
-                    break
+        def handle_result(item: Tuple[np.ndarray, FrameDetections]) -> None:
+            frame, frame_detections = item
+            self._collect_frame(
+                frame, frame_detections, target_lc, detections, target_hits
+            )
 
-                if frame_index % frame_step != 0:
-                    frame_index += 1
-                    continue
+        # Decoding, inference and result handling run as three overlapping
+        # stages; the bounded queues keep the reader from racing ahead of YOLO.
+        # Both queues hold full-resolution frames, so keep them shallow: two
+        # batches of read-ahead and one batch awaiting result handling.
+        reader = BackgroundReader(
+            sampled_frames, maxsize=self.prefetch_frames or 2 * batch_size
+        )
+        writer = BackgroundWorker(handle_result, maxsize=batch_size)
 
+        # Sampled frames are buffered and sent to YOLO together so that the
+        # per-call preprocessing and launch overhead is amortised over a batch.
+        batch_frames: List[np.ndarray] = []
+        batch_meta: List[Tuple[int, float]] = []
+
+        def flush_batch() -> None:
+            batch_detections = self._infer_batch(
+                batch_frames, batch_meta, confidence_threshold
+            )
+            for frame, frame_detections in zip(batch_frames, batch_detections):
+                writer.submit((frame, frame_detections))
+            batch_frames.clear()
+            batch_meta.clear()
+
+        processed_frames = 0
+
+        try:
+            for frame_index, frame in reader:
                 processed_frames += 1
-                timestamp_seconds = frame_index / fps
+                batch_frames.append(frame)
+                batch_meta.append((frame_index, frame_index / fps))
 
-                frame_detections = self._infer_frame(
-                    frame,
-                    confidence_threshold,
-                    timestamp_seconds,
-                    frame_index,
-                )
+                if len(batch_frames) >= batch_size:
+                    flush_batch()
 
-                if frame_detections.objects:
-                    detections.append(frame_detections)
-
-                    if target_object:
-                        matches = [
-                            obj.to_dict()
-                            for obj in frame_detections.objects
-                            if obj.class_name.lower() == target_object.lower()
-                        ]
-                        if matches:
-                            target_hits.append(
-                                {
-                                    "timestamp": frame_detections.timestamp,
-                                    "timestamp_formatted": self._format_timestamp(
-                                        frame_detections.timestamp
-                                    ),
-                                    "image": frame_detections.image_b64,
-                                    "objects": matches,
-                                }
-                            )
-
-                if max_frames and processed_frames >= max_frames:
-                    logger.info(
-                        "Max frames limit reached (%d); stopping processing", max_frames
-                    )
-                    break
-
-                frame_index += 1
+            if batch_frames:
+                flush_batch()
+
+            writer.join()
 
         finally:
+            reader.close()
+            writer.close()
             capture.release()
 
+        if max_frames and processed_frames >= max_frames:
+            logger.info("Max frames limit reached (%d); stopped processing", max_frames)
+
         summary = {
             "fps": fps,
             "duration_seconds": duration,
@@ -216,63 +481,260 @@ class DetectionService:
             "summary": summary,
         }
 
-    def _infer_frame(
+    def _open_capture(self, video_path: Path) -> Tuple[object, float, int, bool]:
+        """
+        Open ``video_path`` for decoding.
+
+        Returns ``(capture, fps, total_frames, seekable)``. Uses NVDEC through
+        ffmpegcv or PyAV (optionally hardware-accelerated) when enabled,
+        falling back to OpenCV's software decoder.
+        """
+        if self.use_nvdec:
+            try:
+                capture = ffmpegcv.VideoCaptureNV(str(video_path), pix_fmt="bgr24")
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(
+                    "NVDEC decode unavailable for '%s' (%s); falling back to OpenCV",
+                    video_path.name,
+                    exc,
+                )
+            else:
+                # ffmpegcv streams frames from an ffmpeg pipe and cannot seek.
+                return capture, float(capture.fps or 0.0), int(capture.count or 0), False
+
+        if self.use_pyav:
+            try:
+                capture = PyAVCapture(str(video_path), hwaccel=self.pyav_hwaccel)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(
+                    "PyAV decode unavailable for '%s' (%s); falling back to OpenCV",
+                    video_path.name,
+                    exc,
+                )
+            else:
+                # Sequential decode only; frames skipped by the sampler are
+                # grabbed but never converted to arrays.
+                return capture, capture.fps, capture.frame_count, False
+
+        capture = cv2.VideoCapture(str(video_path))
+        if not capture.isOpened():
+            raise RuntimeError(f"Unable to open video file: {video_path}")
+
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or 0
+        return capture, fps, total_frames, True
+
+    @staticmethod
+    def _should_seek(video_path: Path, frame_step: int) -> bool:
+        """
+        Decide whether seeking to each sample beats grabbing through the stream.
+
+        Every CAP_PROP_POS_FRAMES seek restarts decoding at the previous
+        keyframe, so it only saves work when samples are further apart than
+        the keyframe spacing. Without PyAV to measure that, decode sequentially.
+        """
+        keyframe_interval = probe_keyframe_interval(str(video_path))
+        if keyframe_interval is None:
+            return False
+        logger.debug(
+            "Keyframe interval of '%s' is %d frames (frame_step=%d)",
+            video_path.name,
+            keyframe_interval,
+            frame_step,
+        )
+        return frame_step > keyframe_interval
+
+    @staticmethod
+    def _iter_sampled_frames(
+        capture: cv2.VideoCapture,
+        frame_step: int,
+        total_frames: int,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield ``(frame_index, frame)`` for every ``frame_step``-th frame.
+
+        Seeks to each sample when ``total_frames`` is given, otherwise walks
+        the stream and grabs the frames in between without converting them.
+        """
+        if total_frames > 0:
+            # Samples are further apart than the keyframe spacing, so jumping
+            # to each one decodes fewer frames than walking the stream.
+            for frame_index in range(0, total_frames, frame_step):
+                capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+                ret, frame = capture.read()
+                if not ret:
+                    return
+                yield frame_index, frame
+            return
+
+        # Frame count unknown, the reader cannot seek, or samples are closer
+        # together than keyframes, where seeking decodes more than walking.
+        logger.info(
+            "Decoding sequentially (frame_step=%d, total_frames=%d)",
+            frame_step,
+            total_frames,
+        )
+        frame_index = 0
+        while True:
+            ret, frame = capture.read()
+            if not ret:
+                return
+            yield frame_index, frame
+            # Advance past the frames between samples without converting them.
+            for _ in range(frame_step - 1):
+                if not _skip_frame(capture):
+                    return
+            frame_index += frame_step
+
+    def _collect_frame(
         self,
         frame: np.ndarray,
+        frame_detections: FrameDetections,
+        target_lc: Optional[str],
+        detections: List[FrameDetections],
+        target_hits: List[Dict[str, object]],
+    ) -> None:
+        if not frame_detections.objects:
+            return
+
+        matches: List[Dict[str, object]] = []
+        if target_lc:
+            matches = [
+                obj.to_dict()
+                for obj in frame_detections.objects
+                if obj.class_name == target_lc
+            ]
+
+        # Encoding is the most expensive part of handling a frame, so only do
+        # it for frames that are returned with an image: all of them when no
+        # target was requested, otherwise just the target hits.
+        if not target_lc or matches:
+            frame_detections.image_b64 = self._encode_jpeg(frame)
+
+        detections.append(frame_detections)
+
+        if matches:
+            target_hits.append(
+                {
+                    "timestamp": frame_detections.timestamp,
+                    "timestamp_formatted": self._format_timestamp(
+                        frame_detections.timestamp
+                    ),
+                    "image": frame_detections.image_b64,
+                    "objects": matches,
+                }
+            )
+
+    @staticmethod
+    def _encode_jpeg(frame: np.ndarray) -> Optional[str]:
+        success, buffer = cv2.imencode(
+            ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY]
+        )
+        if not success:
+            return None
+        # b2a_base64 reads the encoded buffer in place instead of copying it
+        # to bytes first.
+        return binascii.b2a_base64(buffer, newline=False).decode("ascii")
+
+    def _class_name_table(self, names: Dict[int, str]) -> List[str]:
+        """Return the model's lowercased class names indexed by class id, built once."""
+        if self._class_names is None:
+            self._class_names = [
+                names.get(cls_id, str(cls_id)).lower()
+                for cls_id in range(max(names, default=-1) + 1)
+            ]
+        return self._class_names
+
+    def _infer_batch(
+        self,
+        frames: List[np.ndarray],
+        metadata: List[Tuple[int, float]],
         min_confidence: float,
-        timestamp: float,
-        frame_index: int,
-    ) -> FrameDetections:
-        result = self.model(frame, verbose=False)
-        frame_result = result[0]
-        names = frame_result.names
+    ) -> List[FrameDetections]:
+        results = self.model(
+            frames, verbose=False, imgsz=self.image_size, half=self.half
+        )
+
+        return [
+            FrameDetections(
+                timestamp=timestamp,
+                frame_index=frame_index,
+                objects=self._build_detections(frame_result, frame, min_confidence),
+            )
+            for frame, (frame_index, timestamp), frame_result in zip(
+                frames, metadata, results
+            )
+        ]
+
+    def _build_detections(
+        self,
+        frame_result: object,
+        frame: np.ndarray,
+        min_confidence: float,
+    ) -> List[Detection]:
+        """Turn one YOLO result into Detections, dropping low-confidence boxes."""
+        boxes = frame_result.boxes
+        if boxes is None or boxes.cls is None:
+            return []
+
+        class_names = self._class_name_table(frame_result.names)
+        # One device-to-host copy per tensor instead of a scalar sync per box,
+        # and the confidence filter runs vectorized.
+        confidences = boxes.conf.detach().cpu().numpy()
+        keep = confidences >= min_confidence
+        if not keep.any():
+            return []
+        cls_ids = boxes.cls.detach().cpu().numpy()[keep].astype(np.int32).tolist()
+        bboxes = boxes.xyxy.detach().cpu().numpy()[keep].tolist()
 
         objects: List[Detection] = []
+        for cls_id, confidence, bbox in zip(cls_ids, confidences[keep].tolist(), bboxes):
+            class_name = (
+                class_names[cls_id] if 0 <= cls_id < len(class_names) else str(cls_id)
+            )
+
+            # Extract color information from the detected object
+            color_name, color_rgb = extract_dominant_color(frame, bbox)
 
-        if frame_result.boxes is not None and frame_result.boxes.cls is not None:
-            for idx, cls_tensor in enumerate(frame_result.boxes.cls):
-                confidence = float(frame_result.boxes.conf[idx].item())
-                if confidence < min_confidence:
-                    continue
-
-                cls_id = int(cls_tensor.item())
-                class_name = names.get(cls_id, str(cls_id))
-                bbox = frame_result.boxes.xyxy[idx].tolist()
-                
-                # Extract color information from the detected object
-                color_name, color_rgb = extract_dominant_color(frame, bbox)
-                
-                objects.append(
-                    Detection(
-                        class_name=class_name,
-                        confidence=confidence,
-                        bbox=[float(coord) for coord in bbox],
-                        color=color_name,
-                        color_rgb=color_rgb,
-                    )
+            objects.append(
+                Detection(
+                    class_name=class_name,
+                    confidence=confidence,
+                    bbox=bbox,
+                    color=color_name,
+                    color_rgb=color_rgb,
                 )
+            )
 
-        image_b64: Optional[str] = None
-        if objects:
-            success, buffer = cv2.imencode(".jpg", frame)
-            if success:
-                image_b64 = base64.b64encode(buffer).decode("utf-8")
-
-        return FrameDetections(
-            timestamp=timestamp,
-            frame_index=frame_index,
-            objects=objects,
-            image_b64=image_b64,
-        )
+        return objects
 
     @staticmethod
     def _format_timestamp(seconds: float) -> str:
-        mins = int(seconds // 60)
-        secs = int(seconds % 60)
+        mins, secs = divmod(int(seconds), 60)
         return f"{mins:02d}:{secs:02d}"
 
 
-detector_service = DetectionService(
-    model_path=settings.model_path,
-    default_min_conf=settings.min_confidence,
-)
+@lru_cache(maxsize=None)
+def get_detector_service() -> DetectionService:
+    """
+    Return the shared detector, building it from the settings on first use.
+
+    Importing this module stays cheap (no torch or model load); the cost is
+    paid by whoever first asks for the service.
+    """
+    settings = get_settings()
+    return DetectionService(
+        model_path=settings.model_path,
+        default_min_conf=settings.min_confidence,
+        default_batch_size=settings.batch_size,
+        engine_path=settings.engine_path if settings.use_tensorrt else None,
+        image_size=settings.image_size,
+        int8_engine_path=settings.int8_engine_path if settings.use_int8 else None,
+        use_nvdec=settings.use_nvdec,
+        use_pyav=settings.use_pyav,
+        pyav_hwaccel=settings.pyav_hwaccel,
+        prefetch_frames=settings.prefetch_frames,
+        warmup=settings.warmup,
+        warmup_size=settings.warmup_size,
+        half=settings.half,
+    )
@@ -0,0 +1,109 @@
+"""
+Threading helpers used to overlap the stages of video processing.
+
+``BackgroundReader`` runs a producer (frame decoding) on its own thread and
+``BackgroundWorker`` runs a consumer (result post-processing) on another, both
+connected to the caller through bounded queues so a fast stage cannot run
+arbitrarily far ahead of a slow one.
+"""
+
+from __future__ import annotations
+import queue
+import threading
+from typing import Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class BackgroundReader(Generic[T]):
+    """Iterate ``source`` on a daemon thread and hand items over a bounded queue."""
+
+    def __init__(self, source: Iterable[T], maxsize: int) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(maxsize), 1))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, args=(source,), name="frame-reader", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, source: Iterable[T]) -> None:
+        try:
+            for item in source:
+                if not self._put(item):
+                    return
+        except BaseException as exc:  # noqa: BLE001 - re-raised in the consumer
+            self._error = exc
+        self._put(_DONE)
+
+    def _put(self, item: object) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self) -> Iterator[T]:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+
+    def close(self) -> None:
+        """Stop the producer thread and wait for it to exit."""
+        self._stop.set()
+        self._thread.join()
+
+
+class BackgroundWorker(Generic[T]):
+    """Apply ``handler`` to submitted items, in order, on a daemon thread."""
+
+    def __init__(self, handler: Callable[[T], None], maxsize: int) -> None:
+        self._handler = handler
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(maxsize), 1))
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="result-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is not None:
+                # Keep draining so submit() never blocks on a dead worker.
+                continue
+            try:
+                self._handler(item)
+            except BaseException as exc:  # noqa: BLE001 - re-raised from join()
+                self._error = exc
+
+    def submit(self, item: T) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """Signal the worker to finish pending items and wait for it."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_DONE)
+        self._thread.join()
+
+    def join(self) -> None:
+        """Wait for all submitted items and re-raise any handler error."""
+        self.close()
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,122 @@
+"""
+PyAV-backed video reader exposing the subset of ``cv2.VideoCapture`` used by
+the detection service.
+
+Decoding can be offloaded to the GPU (NVDEC, VideoToolbox, ...) through
+FFmpeg's hwaccel support, and frames are only converted to BGR arrays when
+they are actually retrieved.
+"""
+
+from __future__ import annotations
+import logging
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+try:  # Optional PyAV decoding backend
+    import av
+except ImportError:  # pragma: no cover - optional dependency
+    av = None  # type: ignore[assignment]
+
+try:  # PyAV 14+ hardware acceleration support
+    from av.codec.hwaccel import HWAccel
+except ImportError:  # pragma: no cover - older PyAV versions
+    HWAccel = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+class PyAVCapture:
+    """Sequential reader with ``grab``/``retrieve``/``read`` semantics."""
+
+    def __init__(self, path: str, hwaccel: Optional[str] = None) -> None:
+        if av is None:
+            raise RuntimeError("PyAV is not installed")
+
+        open_kwargs = {}
+        if hwaccel:
+            if HWAccel is None:
+                logger.warning(
+                    "PyAV %s has no hwaccel support; decoding '%s' in software",
+                    av.__version__,
+                    path,
+                )
+            else:
+                open_kwargs["hwaccel"] = HWAccel(
+                    device_type=hwaccel, allow_software_fallback=True
+                )
+
+        try:
+            self._container = av.open(path, **open_kwargs)
+        except Exception as exc:  # noqa: BLE001
+            if not open_kwargs:
+                raise
+            # allow_software_fallback only covers unsupported codecs; a missing
+            # device fails while the hardware context is created.
+            logger.warning(
+                "Hardware decode (%s) unavailable for '%s' (%s); decoding in software",
+                hwaccel,
+                path,
+                exc,
+            )
+            self._container = av.open(path)
+        stream = self._container.streams.video[0]
+        stream.thread_type = "AUTO"
+        self.fps = float(stream.average_rate or 0.0)
+        self.frame_count = int(stream.frames or 0)
+        self._frames: Iterator["av.VideoFrame"] = self._container.decode(stream)
+        self._current: Optional["av.VideoFrame"] = None
+
+    def grab(self) -> bool:
+        """Decode the next frame without converting it."""
+        self._current = next(self._frames, None)
+        return self._current is not None
+
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Convert the last grabbed frame to a BGR array."""
+        if self._current is None:
+            return False, None
+        return True, self._current.to_ndarray(format="bgr24")
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self) -> None:
+        self._container.close()
+
+
+def probe_keyframe_interval(path: str, max_packets: int = 1000) -> Optional[int]:
+    """
+    Return the largest keyframe spacing, in frames, at the start of a video.
+
+    Only packets are demuxed (nothing is decoded), so this is cheap. If no
+    second keyframe shows up within ``max_packets`` the number of packets read
+    is returned as a lower bound. Returns None when PyAV is missing or the
+    file cannot be demuxed.
+    """
+    if av is None:
+        return None
+
+    keyframes = []
+    packets = 0
+    try:
+        with av.open(path) as container:
+            stream = container.streams.video[0]
+            for packet in container.demux(stream):
+                if packet.size == 0:  # flush packet at end of stream
+                    continue
+                if packet.is_keyframe:
+                    keyframes.append(packets)
+                packets += 1
+                if len(keyframes) >= 3 or packets >= max_packets:
+                    break
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Unable to probe keyframes of '%s': %s", path, exc)
+        return None
+
+    if not packets:
+        return None
+    if len(keyframes) < 2:
+        return packets
+    return max(later - earlier for earlier, later in zip(keyframes, keyframes[1:]))